@@ -1,43 +1,96 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 
 def run_analytics(df: pd.DataFrame, schema: Dict) -> Dict:
     """
     Core analytics engine — category-aware.
     Runs analytics both overall and per category.
+    Expects the time column already parsed and the frame sorted by it;
+    the frame is only read, never modified.
     """
     time_col      = schema["time_columns"][0]
     metric_cols   = schema["metric_columns"]
     category_cols = schema["category_columns"]
+    labels        = schema["labels"]
 
-    # Parse dates and sort
-    df[time_col] = pd.to_datetime(df[time_col], errors="coerce")
-    df = df.sort_values(time_col).reset_index(drop=True)
+    # Pull each hot column out of the frame once; every pass below reuses them
+    metric_arrays, dates = column_arrays(df, time_col, metric_cols)
+    stats                = compute_column_stats(metric_arrays)
 
     results = {}
 
     # Overall analytics (all data combined)
-    results["summary"]           = compute_summary(df, metric_cols)
-    results["trends"]            = compute_trends(df, time_col, metric_cols)
-    results["period_comparison"] = compute_period_comparison(df, time_col, metric_cols)
-    results["anomalies"]         = detect_anomalies(df, time_col, metric_cols)
+    results["summary"]           = compute_summary(stats)
+    results["trends"]            = compute_trends(stats, labels)
+    results["period_comparison"] = compute_period_comparison(metric_arrays, dates)
+    results["anomalies"]         = detect_anomalies(metric_arrays, dates, stats)
 
     # Category-level analytics (per program/group) — most accurate
     if category_cols:
         results["category_analysis"] = compute_category_analytics(
-            df, time_col, metric_cols, category_cols[0]
+            df, time_col, metric_cols, category_cols[0], labels
         )
 
     return results
 
 
+def column_arrays(
+    df: pd.DataFrame,
+    time_col: str,
+    metric_cols: List[str]
+) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Extract metric columns as float64 arrays (missing values as NaN)
+    and the time column as an array, aligned row for row.
+    """
+    metric_arrays = {
+        col: df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        for col in metric_cols
+    }
+    dates = df[time_col].to_numpy()
+
+    return metric_arrays, dates
+
+
+def compute_column_stats(metric_arrays: Dict[str, np.ndarray]) -> Dict[str, Dict]:
+    """
+    Compute the stats shared by summary, trends and anomaly detection
+    once per metric, from its non-missing values. The spread is left to
+    detect_anomalies, which only runs on the overall data.
+    """
+    stats = {}
+
+    for col, arr in metric_arrays.items():
+        values = arr[~np.isnan(arr)]
+        count  = len(values)
+
+        if count == 0:
+            stats[col] = {"values": values, "count": 0}
+            continue
+
+        total = float(values.sum())
+
+        stats[col] = {
+            "values": values,
+            "count":  count,
+            "sum":    total,
+            "mean":   total / count,
+            "min":    float(values.min()),
+            "max":    float(values.max()),
+            "last":   float(values[-1]),
+        }
+
+    return stats
+
+
 def compute_category_analytics(
     df: pd.DataFrame,
     time_col: str,
     metric_cols: List[str],
-    category_col: str
+    category_col: str,
+    labels: Dict[str, str]
 ) -> Dict:
     """
     Run trend + period comparison separately for each category.
@@ -45,29 +98,31 @@ def compute_category_analytics(
     """
     category_results = {}
 
-    for category in sorted(df[category_col].unique()):
-        subset = df[df[category_col] == category].copy()
-        subset = subset.sort_values(time_col).reset_index(drop=True)
+    # Sort once so every group is already in time order — no per-category
+    # mask, copy, or re-sort
+    df_sorted = df.sort_values([category_col, time_col])
+
+    for category, subset in df_sorted.groupby(category_col, sort=True, observed=True):
+        metric_arrays, dates = column_arrays(subset, time_col, metric_cols)
+        stats                = compute_column_stats(metric_arrays)
 
         category_results[str(category)] = {
-            "summary":           compute_summary(subset, metric_cols),
-            "trends":            compute_trends(subset, time_col, metric_cols),
-            "period_comparison": compute_period_comparison(subset, time_col, metric_cols),
+            "summary":           compute_summary(stats),
+            "trends":            compute_trends(stats, labels),
+            "period_comparison": compute_period_comparison(metric_arrays, dates),
         }
 
     return category_results
 
 
-def compute_summary(df: pd.DataFrame, metric_cols: List[str]) -> Dict:
+def compute_summary(stats: Dict[str, Dict]) -> Dict:
     """
     Compute summary statistics for each metric column.
     """
     summary = {}
 
-    for col in metric_cols:
-        series = df[col].dropna()
-
-        if len(series) == 0:
+    for col, st in stats.items():
+        if st["count"] == 0:
             summary[col] = {
                 "total": 0, "average": 0, "min": 0,
                 "max": 0, "latest": 0, "count": 0
@@ -75,32 +130,26 @@ def compute_summary(df: pd.DataFrame, metric_cols: List[str]) -> Dict:
             continue
 
         summary[col] = {
-            "total":   round(float(series.sum()), 2),
-            "average": round(float(series.mean()), 2),
-            "min":     round(float(series.min()), 2),
-            "max":     round(float(series.max()), 2),
-            "latest":  round(float(series.iloc[-1]), 2),
-            "count":   int(series.count())
+            "total":   round(st["sum"], 2),
+            "average": round(st["mean"], 2),
+            "min":     round(st["min"], 2),
+            "max":     round(st["max"], 2),
+            "latest":  round(st["last"], 2),
+            "count":   int(st["count"])
         }
 
     return summary
 
 
-def compute_trends(
-    df: pd.DataFrame,
-    time_col: str,
-    metric_cols: List[str]
-) -> Dict:
+def compute_trends(stats: Dict[str, Dict], labels: Dict[str, str]) -> Dict:
     """
     Detect trend direction for each metric using linear regression slope.
     Returns: improving / declining / stable
     """
     trends = {}
 
-    for col in metric_cols:
-        series = df[col].dropna()
-
-        if len(series) < 2:
+    for col, st in stats.items():
+        if st["count"] < 2:
             trends[col] = {
                 "direction":      "insufficient data",
                 "slope":          0,
@@ -108,23 +157,27 @@ def compute_trends(
             }
             continue
 
-        x     = np.arange(len(series))
-        y     = series.values
-        slope = float(np.polyfit(x, y, 1)[0])
-        avg   = float(series.mean())
+        # Closed-form least-squares slope for x = 0..n-1 (no Vandermonde/lstsq)
+        n     = st["count"]
+        sx    = (n - 1) * n / 2
+        sxx   = (n - 1) * n * (2 * n - 1) / 6
+        sy    = st["sum"]
+        sxy   = (np.arange(n) * st["values"]).sum()
+        slope = float((n * sxy - sx * sy) / (n * sxx - sx * sx))
+        avg   = st["mean"]
 
         # 2% of average = meaningful change threshold
         threshold = avg * 0.02
 
         if slope > threshold:
             direction      = "improving"
-            interpretation = f"{col.replace('_', ' ').title()} is trending upward over time."
+            interpretation = f"{labels[col]} is trending upward over time."
         elif slope < -threshold:
             direction      = "declining"
-            interpretation = f"{col.replace('_', ' ').title()} is trending downward and may need attention."
+            interpretation = f"{labels[col]} is trending downward and may need attention."
         else:
             direction      = "stable"
-            interpretation = f"{col.replace('_', ' ').title()} has remained relatively stable."
+            interpretation = f"{labels[col]} has remained relatively stable."
 
         trends[col] = {
             "direction":      direction,
@@ -136,20 +189,20 @@ def compute_trends(
 
 
 def compute_period_comparison(
-    df: pd.DataFrame,
-    time_col: str,
-    metric_cols: List[str]
+    metric_arrays: Dict[str, np.ndarray],
+    dates: np.ndarray
 ) -> Dict:
     """
     Compare latest period vs previous period.
     Returns absolute change, percentage change, and direction.
     """
     comparison = {}
+    has_date   = ~pd.isna(dates)
 
-    for col in metric_cols:
-        series = df[[time_col, col]].dropna()
+    for col, arr in metric_arrays.items():
+        values = arr[has_date & ~np.isnan(arr)]
 
-        if len(series) < 2:
+        if len(values) < 2:
             comparison[col] = {
                 "latest_value":   0,
                 "previous_value": 0,
@@ -160,8 +213,8 @@ def compute_period_comparison(
             }
             continue
 
-        latest   = float(series[col].iloc[-1])
-        previous = float(series[col].iloc[-2])
+        latest   = float(values[-1])
+        previous = float(values[-2])
         change   = round(latest - previous, 2)
 
         if previous != 0:
@@ -192,9 +245,9 @@ def compute_period_comparison(
 
 
 def detect_anomalies(
-    df: pd.DataFrame,
-    time_col: str,
-    metric_cols: List[str]
+    metric_arrays: Dict[str, np.ndarray],
+    dates: np.ndarray,
+    stats: Dict[str, Dict]
 ) -> List[Dict]:
     """
     Flag sudden spikes or drops using Z-score method.
@@ -202,32 +255,37 @@ def detect_anomalies(
     """
     anomalies = []
 
-    for col in metric_cols:
-        series = df[col].dropna()
+    for col, arr in metric_arrays.items():
+        st = stats[col]
 
-        if len(series) < 3:
+        if st["count"] < 3:
             continue
 
-        mean = series.mean()
-        std  = series.std()
+        std = st["values"].std(ddof=1)
 
         if std == 0:
             continue
 
-        for i, value in enumerate(series):
-            z_score = (value - mean) / std
+        # Missing values give NaN z-scores, which never pass the threshold
+        z   = (arr - st["mean"]) / std
+        idx = np.flatnonzero(np.abs(z) > 2)
+
+        if len(idx) == 0:
+            continue
+
+        # Format only the flagged dates, in bulk; unparseable dates stay "NaT"
+        date_strs = pd.to_datetime(dates[idx]).strftime("%Y-%m-%d").fillna("NaT")
 
-            if abs(z_score) > 2:
-                flag_type = "spike" if z_score > 0 else "drop"
-                date_val  = str(df[time_col].iloc[i].date())
+        for value, z_score, date_val in zip(arr[idx], z[idx], date_strs):
+            flag_type = "spike" if z_score > 0 else "drop"
 
-                anomalies.append({
-                    "metric":  col,
-                    "date":    date_val,
-                    "value":   round(float(value), 2),
-                    "flag":    flag_type,
-                    "z_score": round(float(z_score), 2),
-                    "note":    f"Unusual {flag_type} detected in {col.replace('_', ' ')} on {date_val}."
-                })
+            anomalies.append({
+                "metric":  col,
+                "date":    date_val,
+                "value":   round(float(value), 2),
+                "flag":    flag_type,
+                "z_score": round(float(z_score), 2),
+                "note":    f"Unusual {flag_type} detected in {col.replace('_', ' ')} on {date_val}."
+            })
 
-    return anomalies
\ No newline at end of file
+    return anomalies
@@ -1,24 +1,96 @@
+import io
+import re
 import pandas as pd
-from fastapi import UploadFile
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
 
-def load_file(file: UploadFile) -> pd.DataFrame:
+
+# Every ASCII non-word character maps to "_" — same result as re.sub(r"[^\w]", "_")
+_HEADER_TRANS = str.maketrans({
+    c: "_" for c in map(chr, range(128)) if not (c.isalnum() or c == "_")
+})
+_NON_WORD = re.compile(r"[^\w]")
+
+# pandas' default missing-value markers, so Arrow reads the same cells as null
+_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+]
+
+
+def clean_column_name(name) -> str:
+    """
+    Strip, lowercase, and replace every non-word character with an underscore.
+    """
+    cleaned = str(name).strip().lower()
+
+    if cleaned.isascii():
+        return cleaned.translate(_HEADER_TRANS)
+    return _NON_WORD.sub("_", cleaned)
+
+
+def read_csv(file) -> pd.DataFrame:
+    """
+    Read a CSV with pyarrow's multi-threaded parser when it is installed.
+    Nulls and blank headers are read the way pandas reads them. Falls back
+    to pandas for anything Arrow rejects or would still read differently
+    (non-UTF-8 headers or text, duplicate headers).
+    """
+    if pa is not None:
+        try:
+            table = pacsv.read_csv(
+                file,
+                read_options=pacsv.ReadOptions(use_threads=True),
+                convert_options=pacsv.ConvertOptions(
+                    null_values=_NA_VALUES,
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=True,
+                ),
+            )
+            # pandas names blank headers "Unnamed: <position>"
+            table = table.rename_columns([
+                name or f"Unnamed: {i}" for i, name in enumerate(table.column_names)
+            ])
+            is_binary = any(pa.types.is_binary(field.type) for field in table.schema)
+            is_unique = len(set(table.column_names)) == len(table.column_names)
+            if is_unique and not is_binary:
+                df = table.to_pandas(
+                    split_blocks=True, self_destruct=True, date_as_object=False
+                )
+                # split_blocks leaves one block per column; copy() consolidates
+                # them into one column-contiguous block per dtype, so pandas
+                # doesn't re-consolidate lazily during the analytics passes
+                return df.copy()
+        except (pa.ArrowInvalid, UnicodeDecodeError):
+            # Non-UTF-8 headers only fail once Arrow decodes the column names
+            pass
+        file.seek(0)
+
+    try:
+        return pd.read_csv(file, encoding="utf-8")
+    except UnicodeDecodeError:
+        file.seek(0)
+        return pd.read_csv(file, encoding="latin-1")
+
+
+def load_file(filename: str, content: bytes) -> pd.DataFrame:
     """
-    Load CSV or Excel file into a clean Pandas DataFrame.
+    Load CSV or Excel file contents into a clean Pandas DataFrame.
     Handles: missing values, messy headers, duplicates, encoding issues.
     """
-    filename = file.filename.lower()
+    filename = filename.lower()
 
     # --- Load file ---
     if filename.endswith(".csv"):
-        try:
-            df = pd.read_csv(file.file, encoding="utf-8")
-        except UnicodeDecodeError:
-            file.file.seek(0)
-            df = pd.read_csv(file.file, encoding="latin-1")
+        df = read_csv(io.BytesIO(content))
 
     elif filename.endswith((".xls", ".xlsx")):
-        df = pd.read_excel(file.file)
+        df = pd.read_excel(io.BytesIO(content))
 
     else:
         raise ValueError("Unsupported file type. Please upload CSV or Excel.")
@@ -27,14 +99,8 @@ def load_file(file: UploadFile) -> pd.DataFrame:
         raise ValueError("Uploaded file is empty.")
 
     # --- Clean column names ---
-    # strips spaces, lowercases, replaces spaces with underscores
-    df.columns = (
-        df.columns
-        .str.strip()
-        .str.lower()
-        .str.replace(" ", "_", regex=False)
-        .str.replace(r"[^\w]", "_", regex=True)
-    )
+    # strips spaces, lowercases, replaces spaces and symbols with underscores
+    df.columns = [clean_column_name(c) for c in df.columns]
 
     # --- Remove fully empty rows and columns ---
     df.dropna(how="all", inplace=True)
@@ -9,6 +9,7 @@ def detect_schema(df: pd.DataFrame) -> Dict:
       - time_columns: columns that look like dates
       - metric_columns: numeric columns
       - category_columns: text/low-cardinality columns
+      - labels: display label for each metric and category column
     """
     time_columns = []
     metric_columns = []
@@ -29,42 +30,28 @@ def detect_schema(df: pd.DataFrame) -> Dict:
             col_lower = col.lower()
             is_name_hint = any(hint in col_lower for hint in name_hints)
 
-            # Try multiple date formats
-            date_formats = [
-                "%Y-%m-%d",    # 2024-01-01
-                "%m/%d/%Y",    # 01/01/2024
-                "%m/%d/%y",    # 1/1/24
-                "%d-%m-%Y",    # 01-01-2024
-                "%B %Y",       # January 2024
-                "%b %Y",       # Jan 2024
-                "%Y-%m",       # 2024-01
-                "%Y",          # 2024
-            ]
-
-            parsed_successfully = False
-
-            # Try each format explicitly first
-            for fmt in date_formats:
+            # Parse a sample first: ISO 8601 fast path, then mixed-format inference.
+            # Only a format that works on the sample is tried on the whole column.
+            sample = df[col].dropna().head(1000)
+            date_format = None
+
+            for fmt in ("ISO8601", "mixed"):
                 try:
-                    parsed = pd.to_datetime(df[col], format=fmt, errors="coerce")
-                    if parsed.notna().sum() > len(df) * 0.5:
-                        time_columns.append(col)
-                        parsed_successfully = True
+                    parsed = pd.to_datetime(sample, format=fmt, errors="coerce")
+                    if parsed.notna().sum() > len(sample) * 0.5:
+                        date_format = fmt
                         break
                 except Exception:
                     continue
 
-            if parsed_successfully:
-                continue
-
-            # Fall back to pandas inference
-            try:
-                parsed = pd.to_datetime(df[col], errors="coerce", infer_datetime_format=True)
-                if parsed.notna().sum() > len(df) * 0.7:
-                    time_columns.append(col)
-                    continue
-            except Exception:
-                pass
+            if date_format is not None:
+                try:
+                    parsed = pd.to_datetime(df[col], format=date_format, errors="coerce")
+                    if parsed.notna().sum() > len(df) * 0.5:
+                        time_columns.append(col)
+                        continue
+                except Exception:
+                    pass
 
             # Last resort: if column name is a date hint, try harder
             if is_name_hint:
@@ -87,7 +74,11 @@ def detect_schema(df: pd.DataFrame) -> Dict:
     return {
         "time_columns": time_columns,
         "metric_columns": metric_columns,
-        "category_columns": category_columns
+        "category_columns": category_columns,
+        "labels": {
+            col: col.replace("_", " ").title()
+            for col in metric_columns + category_columns
+        }
     }
 
 
@@ -106,4 +97,22 @@ def validate_schema(schema: Dict) -> Dict:
     return {
         "valid": len(errors) == 0,
         "errors": errors
-    }
\ No newline at end of file
+    }
+
+
+def prepare_timeseries(df: pd.DataFrame, schema: Dict) -> pd.DataFrame:
+    """
+    Parse the primary time column and sort by it — done once per upload so
+    analytics and charts can share the same frame without copying it.
+    Skips the parse for columns already read as datetimes and the sort for
+    data already in time order.
+    """
+    time_col = schema["time_columns"][0]
+
+    if not pd.api.types.is_datetime64_any_dtype(df[time_col]):
+        df[time_col] = pd.to_datetime(df[time_col], errors="coerce")
+
+    if not df[time_col].is_monotonic_increasing:
+        df = df.sort_values(time_col).reset_index(drop=True)
+
+    return df
\ No newline at end of file
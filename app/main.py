@@ -1,8 +1,14 @@
+import asyncio
+import hashlib
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict, List, Tuple
 from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, Response
 from app.ingestion.loader import load_file
-from app.ingestion.schema_detector import detect_schema, validate_schema
+from app.ingestion.schema_detector import detect_schema, validate_schema, prepare_timeseries
 from app.analytics.engine import run_analytics
 from app.visuals.charts import generate_charts
 from app.reports.exporter import generate_pdf_report
@@ -15,19 +21,69 @@ app = FastAPI(
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+# Processed uploads keyed by file type + content hash, so /report can reuse
+# what /upload just computed for the same file. Least recently used evicted.
+# Entries are (cost, result); cost estimates memory as rows x metric columns,
+# since every chart keeps a per-row list for each metric.
+RESULT_CACHE: "OrderedDict[str, Tuple[int, Dict]]" = OrderedDict()
+RESULT_CACHE_SIZE   = 32
+RESULT_CACHE_BUDGET = 2_000_000   # ~100 bytes per cell once charted -> ~200 MB
+
 
 @app.get("/")
 def root():
     return FileResponse("app/static/dashboard.html")
 
 
-@app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+def preview_records(df: pd.DataFrame, n: int = 5) -> List[Dict]:
     """
-    Accepts CSV or Excel. Returns schema, analytics, and chart data.
+    First n rows as records. Date columns the CSV reader already parsed are
+    written back as text the way such files have them: YYYY-MM-DD, plus the
+    time of day only when one is present.
     """
+    head = df.head(n).copy()
+
+    for col in head.columns:
+        if not pd.api.types.is_datetime64_any_dtype(head[col]):
+            continue
+
+        dates    = head[col]
+        has_time = (dates.dropna() != dates.dropna().dt.normalize()).any()
+        fmt      = "%Y-%m-%d %H:%M:%S" if has_time else "%Y-%m-%d"
+        head[col] = dates.dt.strftime(fmt).astype(object).where(dates.notna(), None)
+
+    return head.to_dict(orient="records")
+
+
+async def analyze(df: pd.DataFrame, schema: Dict) -> Tuple[Dict, Dict]:
+    """
+    Run analytics and chart generation concurrently in the threadpool,
+    keeping the CPU-bound work off the event loop.
+    Each stage gets a shallow copy: the column data is shared, but pandas'
+    per-frame caches are not, so the two threads never touch the same one.
+    """
+    analytics, charts = await asyncio.gather(
+        run_in_threadpool(run_analytics, df.copy(deep=False), schema),
+        run_in_threadpool(generate_charts, df.copy(deep=False), schema),
+    )
+    return analytics, charts
+
+
+async def process_upload(file: UploadFile) -> Dict:
+    """
+    Load, validate, and analyze an uploaded file.
+    Returns the cached result when the same file was processed recently.
+    """
+    content  = await file.read()
+    file_ext = file.filename.lower().rsplit(".", 1)[-1]
+    key      = f"{file_ext}:{hashlib.blake2b(content, digest_size=16).hexdigest()}"
+
+    if key in RESULT_CACHE:
+        RESULT_CACHE.move_to_end(key)
+        return RESULT_CACHE[key][1]
+
     try:
-        df = load_file(file)
+        df = load_file(file.filename, content)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -37,45 +93,78 @@ async def upload_file(file: UploadFile = File(...)):
     if not validation["valid"]:
         raise HTTPException(status_code=422, detail=validation["errors"])
 
-    analytics = run_analytics(df.copy(), schema)
-    charts    = generate_charts(df.copy(), schema)
+    # Preview keeps the upload's row order (taken before sorting by time)
+    preview = preview_records(df)
+    df      = prepare_timeseries(df, schema)
 
-    return {
-        "filename":   file.filename,
+    analytics, charts = await analyze(df, schema)
+
+    result = {
         "rows":       len(df),
         "columns":    list(df.columns),
         "schema":     schema,
         "validation": validation,
-        "preview":    df.head(5).to_dict(orient="records"),
+        "preview":    preview,
         "analytics":  analytics,
         "charts":     charts
     }
 
+    cache_result(key, result, len(df) * len(schema["metric_columns"]))
 
-@app.post("/report")
-async def download_report(file: UploadFile = File(...)):
+    return result
+
+
+def cache_result(key: str, result: Dict, cost: int) -> None:
     """
-    Accepts CSV or Excel. Returns a downloadable PDF report.
+    Store a processed upload, evicting least recently used entries until it
+    fits both the entry limit and the memory budget. Results larger than
+    the whole budget are not cached.
     """
-    try:
-        df = load_file(file)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    if cost > RESULT_CACHE_BUDGET:
+        return
 
-    schema     = detect_schema(df)
-    validation = validate_schema(schema)
+    used = sum(entry_cost for entry_cost, _ in RESULT_CACHE.values())
+    while RESULT_CACHE and (
+        len(RESULT_CACHE) >= RESULT_CACHE_SIZE or used + cost > RESULT_CACHE_BUDGET
+    ):
+        _, (evicted_cost, _) = RESULT_CACHE.popitem(last=False)
+        used -= evicted_cost
 
-    if not validation["valid"]:
-        raise HTTPException(status_code=422, detail=validation["errors"])
+    RESULT_CACHE[key] = (cost, result)
+
+
+@app.post("/upload")
+async def upload_file(file: UploadFile = File(...)):
+    """
+    Accepts CSV or Excel. Returns schema, analytics, and chart data.
+    """
+    result = await process_upload(file)
+
+    return {
+        "filename":   file.filename,
+        "rows":       result["rows"],
+        "columns":    result["columns"],
+        "schema":     result["schema"],
+        "validation": result["validation"],
+        "preview":    result["preview"],
+        "analytics":  result["analytics"],
+        "charts":     result["charts"]
+    }
 
-    analytics = run_analytics(df.copy(), schema)
-    charts    = generate_charts(df.copy(), schema)
+
+@app.post("/report")
+async def download_report(file: UploadFile = File(...)):
+    """
+    Accepts CSV or Excel. Returns a downloadable PDF report.
+    """
+    result = await process_upload(file)
 
     report_data = {
         "filename":  file.filename,
-        "rows":      len(df),
-        "analytics": analytics,
-        "charts":    charts
+        "rows":      result["rows"],
+        "labels":    result["schema"]["labels"],
+        "analytics": result["analytics"],
+        "charts":    result["charts"]
     }
 
     pdf_bytes = generate_pdf_report(report_data)
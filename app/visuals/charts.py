@@ -1,82 +1,122 @@
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from typing import Dict, List
-import json
 
 
 def fig_to_clean_json(fig) -> Dict:
     """
-    Convert Plotly figure to JSON with plain numeric arrays.
+    Convert Plotly figure to a JSON-ready dict with plain numeric arrays.
     Prevents binary encoding (bdata) issue in the browser.
     """
-    raw = json.loads(fig.to_json())
+    raw = fig.to_plotly_json()
 
-    # Walk through all data traces and convert any encoded arrays
+    # Walk through all data traces and convert any NumPy arrays to lists
+    # The actual fix is to pass plain Python lists directly
     for trace in raw.get("data", []):
         for key in ["x", "y"]:
             val = trace.get(key)
-            # If it's a dict with bdata, it's binary encoded — replace with empty
-            # The actual fix is to pass plain Python lists directly
-            if isinstance(val, dict) and "bdata" in val:
-                trace[key] = []
+            if isinstance(val, np.ndarray):
+                trace[key] = val.tolist()
 
     return raw
 
 
+def to_plain_list(series: pd.Series) -> List:
+    """
+    Convert a numeric Series to a plain Python list for chart traces.
+    Missing values become None so the result stays valid JSON.
+    """
+    values  = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    missing = np.isnan(values)
+
+    if missing.any():
+        values = values.astype(object)
+        values[missing] = None
+
+    return values.tolist()
+
+
+def format_dates(dates: pd.Series) -> np.ndarray:
+    """
+    Format datetimes as YYYY-MM-DD strings with NumPy's vectorized
+    datetime64[D] -> str cast. Missing dates become None.
+    """
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+
+    days    = dates.to_numpy(dtype="datetime64[D]")
+    strs    = days.astype(str)
+    missing = np.isnat(days)
+
+    if missing.any():
+        strs = strs.astype(object)
+        strs[missing] = None
+
+    return strs
+
+
 def generate_charts(df: pd.DataFrame, schema: Dict) -> Dict:
     """
     Generate all chart data for the dashboard.
+    Expects the time column already parsed and the frame sorted by it;
+    the frame is only read, never modified.
     """
     time_col = schema["time_columns"][0]
     metric_cols = schema["metric_columns"]
     category_cols = schema["category_columns"]
+    labels = schema["labels"]
 
-    # Parse dates
-    df[time_col] = pd.to_datetime(df[time_col], errors="coerce")
-    df = df.sort_values(time_col).reset_index(drop=True)
-
-    # Format dates as strings for JSON
-    df["_date_str"] = df[time_col].dt.strftime("%Y-%m-%d")
+    # Format dates as strings for JSON (kept beside the frame, not added to it)
+    date_strs = format_dates(df[time_col])
 
     charts = {}
 
     charts["trend_charts"] = generate_trend_charts(
-        df, "_date_str", metric_cols, category_cols
+        df, date_strs, metric_cols, category_cols, labels
     )
 
     if category_cols:
         charts["category_charts"] = generate_category_charts(
-            df, metric_cols, category_cols
+            df, metric_cols, category_cols, labels
         )
 
-    charts["kpi_cards"] = generate_kpi_cards(df, metric_cols)
+    charts["kpi_cards"] = generate_kpi_cards(df, metric_cols, labels)
 
     return charts
 
 
 def generate_trend_charts(
     df: pd.DataFrame,
-    date_col: str,
+    date_strs: np.ndarray,
     metric_cols: List[str],
-    category_cols: List[str]
+    category_cols: List[str],
+    labels: Dict[str, str]
 ) -> List[Dict]:
     """
     Generate one line chart per metric with plain numeric arrays.
+    date_strs holds the formatted dates, aligned with df's rows.
     """
     trend_charts = []
 
+    # Group once and reuse for every metric — the x-axis of each group
+    # is the same for all metrics, so it is built once as well
+    if category_cols:
+        category_col = category_cols[0]
+        grouped = df.groupby(category_col, sort=True, observed=True)
+        groups  = [
+            (category, subset, date_strs[grouped.indices[category]].tolist())
+            for category, subset in grouped
+        ]
+
     for metric in metric_cols:
         fig = go.Figure()
 
         if category_cols:
-            category_col = category_cols[0]
-            for category in sorted(df[category_col].unique()):
-                subset = df[df[category_col] == category].copy()
-
+            for category, subset, x_vals in groups:
                 # Force plain Python lists — prevents binary encoding
-                x_vals = subset[date_col].tolist()
-                y_vals = [float(v) for v in subset[metric].tolist()]
+                y_vals = to_plain_list(subset[metric])
 
                 fig.add_trace(go.Scatter(
                     x=x_vals,
@@ -87,8 +127,8 @@ def generate_trend_charts(
                     marker=dict(size=6)
                 ))
         else:
-            x_vals = df[date_col].tolist()
-            y_vals = [float(v) for v in df[metric].tolist()]
+            x_vals = date_strs.tolist()
+            y_vals = to_plain_list(df[metric])
 
             fig.add_trace(go.Scatter(
                 x=x_vals,
@@ -100,9 +140,9 @@ def generate_trend_charts(
             ))
 
         fig.update_layout(
-            title=f"{metric.replace('_', ' ').title()} Over Time",
+            title=f"{labels[metric]} Over Time",
             xaxis_title="Date",
-            yaxis_title=metric.replace("_", " ").title(),
+            yaxis_title=labels[metric],
             legend_title="Category",
             template="plotly_white",
             height=400,
@@ -112,7 +152,7 @@ def generate_trend_charts(
         trend_charts.append({
             "metric": metric,
             "chart_type": "line",
-            "chart_json": json.loads(fig.to_json())
+            "chart_json": fig.to_plotly_json()
         })
 
     return trend_charts
@@ -121,7 +161,8 @@ def generate_trend_charts(
 def generate_category_charts(
     df: pd.DataFrame,
     metric_cols: List[str],
-    category_cols: List[str]
+    category_cols: List[str],
+    labels: Dict[str, str]
 ) -> List[Dict]:
     """
     Generate bar charts with plain numeric arrays.
@@ -129,17 +170,17 @@ def generate_category_charts(
     category_charts = []
     category_col = category_cols[0]
 
-    for metric in metric_cols:
-        grouped = (
-            df.groupby(category_col)[metric]
-            .mean()
-            .round(2)
-            .reset_index()
-        )
+    # One grouper pass computes the mean of every metric
+    grouped = (
+        df.groupby(category_col, observed=True)[metric_cols]
+        .mean()
+        .round(2)
+    )
+    x_vals = grouped.index.astype(str).tolist()
 
+    for metric in metric_cols:
         # Force plain Python lists
-        x_vals = grouped[category_col].tolist()
-        y_vals = [float(v) for v in grouped[metric].tolist()]
+        y_vals = to_plain_list(grouped[metric])
 
         fig = go.Figure()
         fig.add_trace(go.Bar(
@@ -151,9 +192,9 @@ def generate_category_charts(
         ))
 
         fig.update_layout(
-            title=f"Average {metric.replace('_', ' ').title()} by {category_col.replace('_', ' ').title()}",
-            xaxis_title=category_col.replace("_", " ").title(),
-            yaxis_title=metric.replace("_", " ").title(),
+            title=f"Average {labels[metric]} by {labels[category_col]}",
+            xaxis_title=labels[category_col],
+            yaxis_title=labels[metric],
             template="plotly_white",
             height=400,
             margin=dict(l=40, r=40, t=60, b=40),
@@ -163,7 +204,7 @@ def generate_category_charts(
         category_charts.append({
             "metric": metric,
             "chart_type": "bar",
-            "chart_json": json.loads(fig.to_json())
+            "chart_json": fig.to_plotly_json()
         })
 
     return category_charts
@@ -171,7 +212,8 @@ def generate_category_charts(
 
 def generate_kpi_cards(
     df: pd.DataFrame,
-    metric_cols: List[str]
+    metric_cols: List[str],
+    labels: Dict[str, str]
 ) -> List[Dict]:
     """
     Generate KPI summary card data for each metric.
@@ -190,7 +232,7 @@ def generate_kpi_cards(
 
         kpi_cards.append({
             "metric": metric,
-            "label": metric.replace("_", " ").title(),
+            "label": labels[metric],
             "latest": round(float(series.iloc[-1]), 2),
             "average": round(float(series.mean()), 2),
             "total": round(float(series.sum()), 2),
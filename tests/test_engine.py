@@ -0,0 +1,26 @@
+import json
+
+import pandas as pd
+
+from app.analytics.engine import run_analytics
+
+
+def test_anomaly_with_missing_date_is_json_safe():
+    values = [10.0] * 23 + [500.0]
+    dates  = pd.date_range("2024-01-01", periods=24, freq="D").tolist()
+    dates[-1] = pd.NaT
+
+    df = pd.DataFrame({"date": dates, "sales": values})
+    schema = {
+        "time_columns": ["date"],
+        "metric_columns": ["sales"],
+        "category_columns": [],
+        "labels": {"sales": "Sales"},
+    }
+
+    anomalies = run_analytics(df, schema)["anomalies"]
+
+    assert len(anomalies) == 1
+    assert anomalies[0]["date"] == "NaT"
+    assert anomalies[0]["note"].endswith("on NaT.")
+    json.dumps(anomalies, allow_nan=False)
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from app.ingestion import loader
+
+pytest.importorskip("pyarrow")
+
+
+CSV_WITH_BLANKS = (
+    b"Month,Program,Enrollment,\n"
+    b"2024-01-01,A,10,x\n"
+    b",,,\n"
+    b"2024-02-01,,12,\n"
+    b"2024-03-01,NA,,y\n"
+    b"2024-04-01,B,14,\n"
+)
+
+
+def test_arrow_and_pandas_parsers_agree_on_blanks(monkeypatch):
+    arrow_df = loader.load_file("data.csv", CSV_WITH_BLANKS)
+
+    monkeypatch.setattr(loader, "pa", None)
+    pandas_df = loader.load_file("data.csv", CSV_WITH_BLANKS)
+
+    assert list(arrow_df.columns) == list(pandas_df.columns)
+    assert len(arrow_df) == len(pandas_df)
+    pd.testing.assert_frame_equal(arrow_df.isna(), pandas_df.isna())
+
+    # Arrow already parses dates; everything else must match value for value
+    pd.testing.assert_series_equal(
+        arrow_df["month"], pd.to_datetime(pandas_df["month"]), check_dtype=False
+    )
+    for col in ["program", "enrollment", "unnamed__3"]:
+        pd.testing.assert_series_equal(
+            arrow_df[col], pandas_df[col], check_dtype=False
+        )
+
+
+def test_latin1_header_falls_back_to_pandas():
+    content = "Date,Région,Value\n2024-01-01,Île,1\n2024-02-01,Nord,2\n".encode("latin-1")
+
+    df = loader.load_file("data.csv", content)
+
+    assert list(df.columns) == ["date", "région", "value"]
+    assert df["région"].tolist() == ["Île", "Nord"]